@@ -15,29 +15,80 @@ import tkinter.messagebox as messagebox
 import tkinter.filedialog as filedialog
 import time
 import math
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import numpy as np
 import random
+import array
 import platform
 import os
 import csv
 import json
 from datetime import datetime
 
-# --- 字体/中文显示适配 ---
+try:
+    from numba import njit
+except ImportError:  # numba 为可选依赖：缺失时内核按普通 Python 函数执行
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖：缺失时使用标准库 json
+    orjson = None
+
+# 放置目标的循环中频繁使用的数学函数/常量，绑定为模块级名字以省去属性查找
+_cos, _sin, _TAU = math.cos, math.sin, 2 * math.pi
+
 system_name = platform.system()
-if system_name == "Windows":
-    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
-elif system_name == "Darwin":
-    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'Heiti TC']
-else:
-    plt.rcParams['font.sans-serif'] = ['WenQuanYi Micro Hei', 'Droid Sans Fallback']
-plt.rcParams['axes.unicode_minus'] = False
+
+
+def _configure_mpl_fonts():
+    """字体/中文显示适配（matplotlib 延迟到首次打开汇总图时才导入与配置）"""
+    import matplotlib.pyplot as plt
+    if system_name == "Windows":
+        plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
+    elif system_name == "Darwin":
+        plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'Heiti TC']
+    else:
+        plt.rcParams['font.sans-serif'] = ['WenQuanYi Micro Hei', 'Droid Sans Fallback']
+    plt.rcParams['axes.unicode_minus'] = False
+
+
+@njit(cache=True, fastmath=True)
+def _trial_metrics(x, y, t, move_threshold):
+    """单次遍历轨迹，返回 (total_distance, peak_velocity, reaction_time)"""
+    total_distance = 0.0
+    peak_velocity = 0.0
+    reaction_time = 0.0
+    rt_found = False
+    for i in range(1, x.shape[0]):
+        # 像素坐标无溢出风险，sqrt(dx*dx + dy*dy) 比 hypot 更易被 LLVM 向量化
+        dx = x[i] - x[i - 1]
+        dy = y[i] - y[i - 1]
+        d = math.sqrt(dx * dx + dy * dy)
+        dt = t[i] - t[i - 1]
+        total_distance += d
+        if dt > 0 and d / dt > peak_velocity:
+            peak_velocity = d / dt
+        # Reaction time：累计位移首次超过阈值的时刻
+        if not rt_found and total_distance >= move_threshold:
+            reaction_time = t[i] - t[0]
+            rt_found = True
+    return total_distance, peak_velocity, reaction_time
+
+
+def _json_default(obj):
+    """json.dump 的回退编码：ndarray 轨迹在保存时一次性转为列表"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 class MouseTrackerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("认知康复评估：鼠标运动学分析工具 (Pro)")
+        self._mpl_ready = False  # matplotlib 字体配置是否已完成（首次绘图时延迟进行）
 
         # 尝试最大化/适配
         try:
@@ -68,16 +119,24 @@ class MouseTrackerApp:
         # 常量与默认配置
         self.DEFAULT_TARGET_RADIUS = 20  # 默认半径（px）
         self.TARGET_RADIUS = self.DEFAULT_TARGET_RADIUS
+        self.MOVE_THRESHOLD = 5.0  # 反应时判定的累计位移阈值（px）
         self.max_trials = 10
         self.current_trial = 0
 
         # 采样节流（秒）
         self.min_sample_interval = 0.01  # 默认 10 ms (100 Hz)
-        self.last_sample_time = 0.0
-
-        # 数据
-        self.trajectory_data = []
+        # <Motion> 只更新最新指针位置，实际采样由 after 定时器按固定间隔完成
+        self._pending_xy = (0, 0)
+        self._sample_ms = 10
+        self._sample_job = None
+        self._motion_bind = None  # <Motion> 绑定的 funcid，仅在记录期间非 None
+
+        # 数据（当轮轨迹按列分别存放在连续的 double 数组中：x, y, t）
+        self._xs = array.array('d')
+        self._ys = array.array('d')
+        self._ts = array.array('d')
         self.session_data = []
+        self._agg = self._new_session_agg()  # 按试次累加的汇总量，供 O(1) 计算平均值
         self.is_recording = False
         self.start_time = 0.0
         self.last_click_pos = (0, 0)
@@ -102,7 +161,13 @@ class MouseTrackerApp:
         self.canvas = tk.Canvas(root, bg=self.colors["canvas_bg"], relief="flat", highlightthickness=1, highlightbackground="#E0E0E0")
         self.canvas.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
         self.canvas.bind("<Configure>", self.on_canvas_resize)
-        self.canvas.bind("<Motion>", self.record_movement)
+
+        # 起点与目标图元只创建一次并绑定点击，之后每轮仅 coords/itemconfig 移动与显隐
+        self.start_circle = self.canvas.create_oval(0, 0, 0, 0, fill=self.colors["accent"], outline="white", width=2, state="hidden", tags="start")
+        self.start_text = self.canvas.create_text(0, 0, text="Start", fill="white", font=("Helvetica", 12, "bold"), state="hidden", tags="start")
+        self.canvas.tag_bind("start", "<Button-1>", self.first_click)
+        self.target_circle = self.canvas.create_oval(0, 0, 0, 0, fill=self.colors["target"], outline="white", width=2, state="hidden", tags="target")
+        self.canvas.tag_bind("target", "<Button-1>", self.handle_target_click)
 
         # 底部：控制区
         self.footer_frame = tk.Frame(root, bg=self.colors["bg"])
@@ -151,6 +216,14 @@ class MouseTrackerApp:
         self.preset_widths = [20, 40]  # px (宽度, 注意绘制以半径 = width/2)
         # preset 组合将被重复/随机化到所需试次数
 
+        # 预热分析内核，避免首个试次承担 JIT 编译开销
+        warm = np.zeros(2, dtype=np.float64)
+        _trial_metrics(warm, warm, warm, self.MOVE_THRESHOLD)
+
+    @staticmethod
+    def _new_session_agg():
+        return {"time": 0.0, "speed": 0.0, "curvature": 0.0, "throughput": 0.0, "n": 0}
+
     def choose_save_dir(self):
         d = filedialog.askdirectory(initialdir=self.save_dir, title="选择保存目录")
         if d:
@@ -186,46 +259,60 @@ class MouseTrackerApp:
         self.parse_params()
 
         # 清屏并初始化状态
-        self.canvas.delete("all")
+        self.canvas.itemconfig("target", state="hidden")
         self.session_data = []
+        self._agg = self._new_session_agg()
         self.current_trial = 0
         self.trial_plan = []
-        self.is_recording = False
+        self._stop_sampling()
         self.last_click_pos = (self.canvas_width // 2, self.canvas_height // 2)
         self.TARGET_RADIUS = self.DEFAULT_TARGET_RADIUS  # 恢复默认（preset 会设置每试次 radius）
 
-        # 若为 preset 模式，则生成试次 plan（target positions 会在 spawn 时计算）
+        # 若为 preset 模式，则生成试次 plan（含预先计算好的 target positions）
         if self.experiment_mode.get() == "preset":
             self.prepare_preset_plan()
 
         # 绘制起点
         r = 30
         cx, cy = self.last_click_pos
-        self.start_circle = self.canvas.create_oval(cx-r, cy-r, cx+r, cy+r, fill=self.colors["accent"], outline="white", width=2, tags="start")
-        self.canvas.create_text(cx, cy, text="Start", fill="white", font=("Helvetica", 12, "bold"), tags="start")
-        self.canvas.tag_bind("start", "<Button-1>", self.first_click)
+        self.canvas.coords(self.start_circle, cx-r, cy-r, cx+r, cy+r)
+        self.canvas.coords(self.start_text, cx, cy)
+        self.canvas.itemconfig("start", state="normal")
         self.info_label.config(text=f"点击蓝色起点开始测试（模式: {self.experiment_mode.get()}, 试次: {self.max_trials}）", fg=self.colors["accent"])
 
     def prepare_preset_plan(self):
         """基于 preset_distances 和 preset_widths 生成 trial_plan（此处生成组合并 shuffle）"""
-        combos = []
-        for d in self.preset_distances:
-            for w in self.preset_widths:
-                combos.append({"distance": d, "width": w})
-        # 如果组合数量小于 max_trials，重复填充
-        plan = []
-        while len(plan) < self.max_trials:
-            # 复制 combos 并随机打乱
-            copy = combos[:]
-            random.shuffle(copy)
-            plan.extend(copy)
-        # 截断到需要长度
-        self.trial_plan = plan[:self.max_trials]
-        # 目标位置会在 spawn_target 中根据上一个点和一个随机角度尝试放置
+        combos = np.array([(d, w) for d in self.preset_distances for w in self.preset_widths])
+        # 如果组合数量小于 max_trials，重复填充：每轮组合独立随机排列后拼接，再截断到需要长度
+        reps = -(-self.max_trials // len(combos))
+        rng = np.random.default_rng()
+        idx = np.concatenate([rng.permutation(len(combos)) for _ in range(reps)])[:self.max_trials]
+        self.trial_plan = [{"distance": int(combos[i, 0]), "width": int(combos[i, 1])} for i in idx]
+        # 预先放置全部目标：假定每次点击都落在目标中心，沿途推进 cursor
+        cursor = self.last_click_pos
+        for p in self.trial_plan:
+            radius = max(2, int(p["width"] / 2))
+            p["target_pos"] = self._place_preset_target(cursor, p["distance"], radius)
+            p["radius"] = radius
+            cursor = p["target_pos"]
+
+    def _place_preset_target(self, origin, dist, radius):
+        """在距 origin 为 dist 的圆周上随机取一个画布内的目标位置"""
+        margin = 10 + radius
+        ox, oy = origin
+        # 尝试多个角度以在画布内放置目标
+        for _ in range(36):
+            ang = random.uniform(0, _TAU)
+            tx = int(ox + dist * _cos(ang))
+            ty = int(oy + dist * _sin(ang))
+            if margin <= tx <= self.canvas_width - margin and margin <= ty <= self.canvas_height - margin:
+                return tx, ty
+        # 退回到随机位置，但尽量保持距离
+        return self._random_target_far_from(origin)
 
     def first_click(self, event):
         """起点点击，开始第一轮"""
-        self.canvas.delete("start")
+        self.canvas.itemconfig("start", state="hidden")
         self.last_click_pos = (event.x, event.y)
         # spawn first target
         self.spawn_target()
@@ -235,48 +322,34 @@ class MouseTrackerApp:
         self.current_trial += 1
         self.is_recording = True
         self.start_time = time.perf_counter()
-        self.trajectory_data = []
-        self.last_sample_time = self.start_time
+        self._xs = array.array('d')
+        self._ys = array.array('d')
+        self._ts = array.array('d')
         # 记录起始点（以 time.perf_counter 计时）
-        self.trajectory_data.append((self.last_click_pos[0], self.last_click_pos[1], self.start_time))
+        self._append_sample(self.last_click_pos[0], self.last_click_pos[1], self.start_time)
+        self._pending_xy = self.last_click_pos
 
-        # 若为 preset 模式，基于 trial_plan[current_trial-1] 生成 target_pos
+        # 仅在记录期间绑定 <Motion>，空闲时 Tk 不会把移动事件派发到 Python
+        self._motion_bind = self.canvas.bind("<Motion>", self._on_motion)
+        self._sample_ms = max(1, int(round(self.min_sample_interval * 1000)))
+        self._sample_job = self.root.after(self._sample_ms, self._sample_tick)
+
+        # 若为 preset 模式，直接取 prepare_preset_plan 预先计算的 target_pos/radius
         if self.experiment_mode.get() == "preset" and (self.current_trial - 1) < len(self.trial_plan):
             plan = self.trial_plan[self.current_trial - 1]
-            dist = plan.get("distance", 200)
-            width = plan.get("width", 2 * self.DEFAULT_TARGET_RADIUS)
-            radius = max(2, int(width / 2))
-            # 尝试多个角度以在画布内放置目标
-            placed = False
-            attempts = 0
-            while not placed and attempts < 36:
-                attempts += 1
-                ang = random.uniform(0, 2 * math.pi)
-                tx = int(self.last_click_pos[0] + dist * math.cos(ang))
-                ty = int(self.last_click_pos[1] + dist * math.sin(ang))
-                margin = 10 + radius
-                if margin <= tx <= self.canvas_width - margin and margin <= ty <= self.canvas_height - margin:
-                    placed = True
-                    break
-            if not placed:
-                # 退回到随机位置，但尽量保持距离
-                tx, ty = self._random_target_far_from(self.last_click_pos)
-            self.target_pos = (tx, ty)
-            draw_radius = radius
-            # 记录 trial 的 width/radius 信息
-            self.trial_plan[self.current_trial - 1].update({"target_pos": self.target_pos, "radius": draw_radius})
-            self.TARGET_RADIUS = draw_radius
+            self.target_pos = plan["target_pos"]
+            self.TARGET_RADIUS = plan["radius"]
         else:
             # 随机放置（避免靠边或过近）
             tx, ty = self._random_target_far_from(self.last_click_pos)
             self.target_pos = (tx, ty)
             self.TARGET_RADIUS = self.DEFAULT_TARGET_RADIUS
 
-        # 绘制目标并绑定点击
+        # 移动并显示目标（图元与点击绑定在 __init__ 中已创建）
         r = self.TARGET_RADIUS
         tx, ty = self.target_pos
-        self.target_circle = self.canvas.create_oval(tx-r, ty-r, tx+r, ty+r, fill=self.colors["target"], outline="white", width=2, tags="target")
-        self.canvas.tag_bind("target", "<Button-1>", self.handle_target_click)
+        self.canvas.coords(self.target_circle, tx-r, ty-r, tx+r, ty+r)
+        self.canvas.itemconfig(self.target_circle, state="normal")
         self.info_label.config(text=f"进度: {self.current_trial}/{self.max_trials} - 请点击红色目标！", fg=self.colors["target"])
 
     def _random_target_far_from(self, pos, min_dist=80):
@@ -284,39 +357,66 @@ class MouseTrackerApp:
         margin = 100
         safe_w = max(self.canvas_width - margin, margin + 1)
         safe_h = max(self.canvas_height - margin, margin + 1)
-        attempts = 0
-        while True:
-            attempts += 1
-            tx = random.randint(margin, safe_w)
-            ty = random.randint(margin, safe_h)
-            if math.hypot(tx - pos[0], ty - pos[1]) >= min_dist or attempts > 30:
+        # 在安全区内均匀采样并拒绝距 pos 过近的点：保持目标在整个安全区内的分布
+        # （即 Fitts 距离 D 的分布）。被拒绝的只是 pos 周围 min_dist 的小圆，期望采样次数接近 1
+        randint = random.randint
+        px, py = pos
+        min_d2 = min_dist * min_dist
+        for _ in range(30):
+            tx = randint(margin, safe_w)
+            ty = randint(margin, safe_h)
+            dx = tx - px
+            dy = ty - py
+            if dx * dx + dy * dy >= min_d2:
                 return tx, ty
+        # 画布过小、始终找不到足够远的点时，接受最后一次采样
+        return tx, ty
+
+    def _on_motion(self, event):
+        """记录最新的鼠标位置（不读时钟，由 _sample_tick 统一采样）"""
+        self._pending_xy = (event.x, event.y)
 
-    def record_movement(self, event):
-        """记录鼠标移动（带节流）"""
+    def _sample_tick(self, _perf=time.perf_counter):
+        """按 min_sample_interval 周期采样最新鼠标位置"""
         if not self.is_recording:
+            self._sample_job = None
             return
-        now = time.perf_counter()
-        if (now - self.last_sample_time) >= self.min_sample_interval:
-            self.trajectory_data.append((event.x, event.y, now))
-            self.last_sample_time = now
+        x, y = self._pending_xy
+        self._append_sample(x, y, _perf())
+        self._sample_job = self.root.after(self._sample_ms, self._sample_tick)
+
+    def _stop_sampling(self):
+        """停止本轮记录并取消尚未执行的采样定时器"""
+        self.is_recording = False
+        if self._motion_bind is not None:
+            # 按 funcid 解绑，同时释放 bind 时注册的 Tcl 命令
+            self.canvas.unbind("<Motion>", self._motion_bind)
+            self._motion_bind = None
+        if self._sample_job is not None:
+            self.root.after_cancel(self._sample_job)
+            self._sample_job = None
+
+    def _append_sample(self, x, y, t):
+        """向当轮轨迹追加一个采样点（三列各自 append，不分配元组/浮点对象）"""
+        self._xs.append(x)
+        self._ys.append(y)
+        self._ts.append(t)
 
     def handle_target_click(self, event):
         """点击目标后记录并分析本轮"""
         if not self.is_recording:
             return
-        self.is_recording = False
+        self._stop_sampling()
         click_ts = time.perf_counter()
         # 添加最后一点
-        self.trajectory_data.append((event.x, event.y, click_ts))
-        # 删除目标显示
-        try:
-            self.canvas.delete("target")
-        except Exception:
-            pass
+        self._append_sample(event.x, event.y, click_ts)
+        # 隐藏目标显示
+        self.canvas.itemconfig(self.target_circle, state="hidden")
 
         # 分析并保存 trial 数据
-        trial_metrics = self.analyze_single_trial(self.trajectory_data, self.target_pos)
+        # np.frombuffer 为零拷贝视图，column_stack 完成唯一一次拷贝得到 (N, 3) 轨迹
+        trajectory = np.column_stack((np.frombuffer(self._xs), np.frombuffer(self._ys), np.frombuffer(self._ts)))
+        trial_metrics = self.analyze_single_trial(trajectory, self.target_pos)
         # 若使用 preset，写入 width/radius/plan info
         if self.experiment_mode.get() == "preset" and (self.current_trial - 1) < len(self.trial_plan):
             plan_info = self.trial_plan[self.current_trial - 1]
@@ -327,6 +427,10 @@ class MouseTrackerApp:
                 "preset_target_pos": plan_info.get("target_pos")
             })
         self.session_data.append(trial_metrics)
+        agg = self._agg
+        for k in ("time", "speed", "curvature", "throughput"):
+            agg[k] += trial_metrics[k]
+        agg["n"] += 1
 
         # 更新 last_click_pos
         self.last_click_pos = (event.x, event.y)
@@ -339,53 +443,35 @@ class MouseTrackerApp:
 
     def analyze_single_trial(self, trajectory, target_pos):
         """分析单次轨迹并返回指标字典"""
-        if len(trajectory) < 2:
+        arr = np.asarray(trajectory, dtype=np.float64).reshape(-1, 3)
+        if len(arr) < 2:
             return {
                 "time": 0, "distance": 0, "speed": 0, "curvature": 1,
                 "ideal_distance": 0, "target_x": target_pos[0], "target_y": target_pos[1],
-                "id": 0, "throughput": 0, "trajectory": list(trajectory),
+                "id": 0, "throughput": 0, "trajectory": arr,
                 "peak_velocity": 0, "reaction_time": 0
             }
-        total_distance = 0.0
-        velocities = []
-        for i in range(1, len(trajectory)):
-            x1, y1, t1 = trajectory[i-1]
-            x2, y2, t2 = trajectory[i]
-            d = math.hypot(x2 - x1, y2 - y1)
-            dt = t2 - t1
-            total_distance += d
-            if dt > 0:
-                velocities.append(d / dt)
-        start_x, start_y, _ = trajectory[0]
-        end_x, end_y, _ = trajectory[-1]
+        # 列数据各自转为连续数组后交给编译内核，一次遍历得到距离、峰值速度与反应时
+        x = np.ascontiguousarray(arr[:, 0])
+        y = np.ascontiguousarray(arr[:, 1])
+        t = np.ascontiguousarray(arr[:, 2])
+        total_distance, peak_velocity, reaction_time = _trial_metrics(x, y, t, self.MOVE_THRESHOLD)
+        start_x, start_y, t0 = arr[0]
+        end_x, end_y, t_end = arr[-1]
         ideal_distance = math.hypot(end_x - start_x, end_y - start_y)
-        time_elapsed = trajectory[-1][2] - trajectory[0][2] if trajectory[-1][2] > trajectory[0][2] else 0.0
-        avg_speed = total_distance / time_elapsed if time_elapsed > 0 else 0.0
+        # 每试次常量只算一次，下面的除法统一改为乘以倒数
+        # 目标半径恒为正，因此 width > 0 无需再判断
+        width = 2 * self.TARGET_RADIUS
+        inv_width = 1.0 / width
+        time_elapsed = float(t_end - t0) if t_end > t0 else 0.0
+        inv_t = 1.0 / time_elapsed if time_elapsed > 0 else 0.0
+        avg_speed = total_distance * inv_t
         curvature = total_distance / ideal_distance if ideal_distance > 0 else 1.0
-        peak_velocity = max(velocities) if velocities else 0.0
-
-        # Reaction time 估计：从起点到累计位移超过阈值的时间
-        move_threshold = 5.0
-        acc_dist = 0.0
-        reaction_time = 0.0
-        t0 = trajectory[0][2]
-        rt_found = False
-        for i in range(1, len(trajectory)):
-            x1, y1, t1 = trajectory[i-1]
-            x2, y2, t2 = trajectory[i]
-            acc_dist += math.hypot(x2 - x1, y2 - y1)
-            if acc_dist >= move_threshold:
-                reaction_time = t2 - t0
-                rt_found = True
-                break
-        if not rt_found:
-            reaction_time = 0.0
 
         # Fitts ID 的简化计算（W 使用目标直径）
         # 注意：更严谨的做法是使用“有效宽度 We”基于命中位置的分布来估计 W。
-        width = 2 * self.TARGET_RADIUS
-        index_of_difficulty = math.log2(ideal_distance / width + 1) if width > 0 else 0.0
-        throughput = index_of_difficulty / time_elapsed if time_elapsed > 0 else 0.0
+        index_of_difficulty = math.log2(ideal_distance * inv_width + 1)
+        throughput = index_of_difficulty * inv_t
 
         return {
             "time": time_elapsed,
@@ -397,7 +483,7 @@ class MouseTrackerApp:
             "throughput": throughput,
             "target_x": target_pos[0],
             "target_y": target_pos[1],
-            "trajectory": list(trajectory),
+            "trajectory": arr,  # (N, 3) ndarray，保存时再转为列表
             "peak_velocity": peak_velocity,
             "reaction_time": reaction_time
         }
@@ -410,25 +496,27 @@ class MouseTrackerApp:
 
         headers = ["Trial_ID", "Time_Sec", "Distance_Px", "Ideal_Distance_Px", "Speed_PxSec", "Curvature", "Index_of_Difficulty_Bits", "Throughput_Bits_Sec", "Target_X", "Target_Y", "Peak_Velocity_PxSec", "Reaction_Time_Sec"]
 
+        rows = [[
+            i + 1,
+            f"{trial['time']:.4f}",
+            f"{trial['distance']:.2f}",
+            f"{trial['ideal_distance']:.2f}",
+            f"{trial['speed']:.2f}",
+            f"{trial['curvature']:.4f}",
+            f"{trial['id']:.4f}",
+            f"{trial['throughput']:.4f}",
+            trial['target_x'],
+            trial['target_y'],
+            f"{trial.get('peak_velocity', 0.0):.2f}",
+            f"{trial.get('reaction_time', 0.0):.4f}"
+        ] for i, trial in enumerate(self.session_data)]
+
         try:
-            with open(csv_path, mode='w', newline='', encoding='utf-8') as f:
+            # 先格式化所有行，再借助 1 MiB 缓冲一次性写出
+            with open(csv_path, mode='w', newline='', encoding='utf-8', buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 writer.writerow(headers)
-                for i, trial in enumerate(self.session_data):
-                    writer.writerow([
-                        i + 1,
-                        f"{trial['time']:.4f}",
-                        f"{trial['distance']:.2f}",
-                        f"{trial['ideal_distance']:.2f}",
-                        f"{trial['speed']:.2f}",
-                        f"{trial['curvature']:.4f}",
-                        f"{trial['id']:.4f}",
-                        f"{trial['throughput']:.4f}",
-                        trial['target_x'],
-                        trial['target_y'],
-                        f"{trial.get('peak_velocity', 0.0):.2f}",
-                        f"{trial.get('reaction_time', 0.0):.4f}"
-                    ])
+                writer.writerows(rows)
             # JSON 保存所有原始轨迹和元数据
             meta = {
                 "created_at": datetime.now().isoformat(),
@@ -440,8 +528,14 @@ class MouseTrackerApp:
                 "trial_plan": self.trial_plan,
                 "trials": self.session_data
             }
-            with open(json_path, 'w', encoding='utf-8') as jf:
-                json.dump(meta, jf, ensure_ascii=False, indent=2)
+            # 紧凑输出：先用 json.dumps（indent=None 时走 C 编码器）生成整串再一次写出；
+            # json.dump 写文件对象时总是走纯 Python 的逐块编码
+            if orjson is not None:
+                with open(json_path, 'wb') as jf:
+                    jf.write(orjson.dumps(meta, option=orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(json_path, 'w', encoding='utf-8') as jf:
+                    jf.write(json.dumps(meta, ensure_ascii=False, separators=(",", ":"), default=_json_default))
             return csv_path, json_path
         except Exception as e:
             messagebox.showerror("保存失败", f"保存数据时发生错误: {e}")
@@ -454,10 +548,11 @@ class MouseTrackerApp:
             messagebox.showinfo("提示", "没有记录到任何试次数据。")
             return
 
-        avg_time = sum(d["time"] for d in self.session_data) / total_trials
-        avg_speed = sum(d["speed"] for d in self.session_data) / total_trials
-        avg_curvature = sum(d["curvature"] for d in self.session_data) / total_trials
-        avg_throughput = sum(d["throughput"] for d in self.session_data) / total_trials
+        agg = self._agg
+        avg_time = agg["time"] / agg["n"]
+        avg_speed = agg["speed"] / agg["n"]
+        avg_curvature = agg["curvature"] / agg["n"]
+        avg_throughput = agg["throughput"] / agg["n"]
 
         saved_csv, saved_json = self.save_session_files()
         if saved_csv and saved_json:
@@ -486,20 +581,32 @@ class MouseTrackerApp:
         lbl_result = tk.Label(top, text=result_text, font=("SimHei", 12), justify="left", bg="#e8f5e9", padx=10, pady=10)
         lbl_result.pack(fill="x", pady=5)
 
+        # matplotlib 只在真正需要绘图时导入，缩短启动时间与内存占用
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.collections import LineCollection
+        from matplotlib.colors import to_rgba
+        if not self._mpl_ready:
+            _configure_mpl_fonts()
+            self._mpl_ready = True
+
         fig, ax = plt.subplots(figsize=(8, 6), dpi=100)
         h = self.canvas_height
         num = len(self.session_data)
+        # 所有轨迹与理想路径各汇总为一个 LineCollection，一次绘制完成
+        segments, colors, ideal_segments = [], [], []
         for i, trial in enumerate(self.session_data):
-            traj = trial.get("trajectory", [])
-            if not traj:
+            traj = trial.get("trajectory")
+            if traj is None or len(traj) == 0:
                 continue
-            x_vals = [p[0] for p in traj]
-            y_vals = [h - p[1] for p in traj]  # 翻转 y 轴以视觉上更直观
-            alpha = 0.3 + 0.7 * (i / max(1, num - 1))
-            ax.plot(x_vals, y_vals, '-', color='#2196F3', alpha=alpha, linewidth=1)
+            segments.append(np.column_stack([traj[:, 0], h - traj[:, 1]]))  # 翻转 y 轴以视觉上更直观
+            colors.append(to_rgba('#2196F3', 0.3 + 0.7 * (i / max(1, num - 1))))
             sx, sy, _ = traj[0]
             ex, ey, _ = traj[-1]
-            ax.plot([sx, ex], [h-sy, h-ey], '--', color='#F44336', alpha=0.4, linewidth=1)
+            ideal_segments.append([(sx, h - sy), (ex, h - ey)])
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=1))
+        ax.add_collection(LineCollection(ideal_segments, colors=to_rgba('#F44336', 0.4), linestyles='--', linewidths=1))
+        ax.autoscale_view()
 
         ax.set_title(f"全 Session 轨迹叠加 ({num} Trials)", fontsize=14)
         ax.set_xlabel("X (px)")
@@ -514,13 +621,13 @@ class MouseTrackerApp:
         """允许在中途停止测试（会保存到当前已完成的试次）"""
         if self.current_trial == 0 or not self.session_data:
             # 没有数据
-            self.is_recording = False
-            self.canvas.delete("target")
+            self._stop_sampling()
+            self.canvas.itemconfig(self.target_circle, state="hidden")
             self.info_label.config(text="已停止（无已记录数据）。", fg="#444")
             return
         if messagebox.askyesno("停止确认", "是否停止当前 Session 并保存已记录数据？"):
-            self.is_recording = False
-            self.canvas.delete("target")
+            self._stop_sampling()
+            self.canvas.itemconfig(self.target_circle, state="hidden")
             self.show_session_summary()
 
 if __name__ == "__main__":
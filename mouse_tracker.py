@@ -1,8 +1,16 @@
 import tkinter as tk
 import time
 import math
+import numpy as np
+import matplotlib
+matplotlib.use('TkAgg') # 启动时即确定后端，避免首次出图时再协商
 import matplotlib.pyplot as plt
+from matplotlib import font_manager
+from matplotlib.font_manager import FontProperties
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
 import random
 import platform
 import os
@@ -23,6 +31,7 @@ else:
 
 plt.rcParams['axes.unicode_minus'] = False # 解决负号显示为方块的问题
 
+
 class MouseTrackerApp:
     def __init__(self, root):
         self.root = root
@@ -55,17 +64,36 @@ class MouseTrackerApp:
 
         # 常量定义
         self.TARGET_RADIUS = 20 # 目标半径 (px)
+        self.TARGET_MARGIN = 100 # 目标距画布边缘的最小距离 (px)，防止太靠边
+        self._rng = random.Random() # 独立的随机数生成器，避免模块级实例的锁与属性查找
 
-        # 数据存储
-        self.trajectory_data = [] 
+        # 数据存储（当轮轨迹写入预分配的 (3, N) int64 缓冲区：x / y (px) 与 t (ns) 三行，nbuf 为已写入点数）
+        self.buf = np.empty((3, 8192), dtype=np.int64)
+        self._bx, self._by, self._bt = self.buf # 三行的视图，逐元素写入时无需构造索引/值元组
+        self.nbuf = 0
         self.is_recording = False
         self.start_time = 0
         self.start_pos = (0, 0)
+        self.target_circle = None # 目标图元只创建一次，之后每轮移动/显隐复用
+        # 采样节流：相邻采样至少间隔 _min_dt_ns 纳秒（8 ms ≈ 125 Hz）
+        self._last_t = 0
+        self._min_dt_ns = 8_000_000
+        # 路径长度在采样时累加，点击时无需再遍历缓冲区
+        self._run_dist = 0.0
+        self._prev_x, self._prev_y = 0, 0
         
         # 多轮测试状态
         self.max_trials = 10
         self.current_trial = 0
         self.session_data = [] 
+        # 汇总指标矩阵，每轮一行：[time, speed, curvature, throughput]，求均值时一次归约
+        self.metrics = np.zeros((self.max_trials, 4))
+
+        # 逐轮写入的 CSV 文件（首个试次完成时才创建；_csv_rows 为已写入的试次数）
+        self._csv_f = None
+        self._csv_w = None
+        self._csv_path = None
+        self._csv_rows = 0
         
         # --- 顶部：标题与状态 ---
         self.header_frame = tk.Frame(root, bg=self.colors["bg"])
@@ -81,6 +109,7 @@ class MouseTrackerApp:
         # 初始尺寸仅为占位，后续自适应
         self.canvas_width = 1000 
         self.canvas_height = 600
+        self._update_safe_area()
         self.canvas = tk.Canvas(root, bg=self.colors["canvas_bg"], relief="flat", highlightthickness=1, highlightbackground="#E0E0E0")
         self.canvas.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
         
@@ -97,16 +126,52 @@ class MouseTrackerApp:
         # 绑定鼠标移动事件
         self.canvas.bind('<Motion>', self.record_movement)
 
+        # 汇总窗口与汇总图只创建一次，之后每个 Session 清空坐标轴后在同一窗口中重绘
+        # （直接构造 Figure 交给 FigureCanvasTkAgg，不经 pyplot 管理，避免额外创建隐藏的 Tk 根窗口）
+        self._summary_fig = Figure(figsize=(8, 6), dpi=100)
+        self._summary_ax = self._summary_fig.add_subplot()
+        self._build_summary_window()
+        # 预热字体查找与 Agg 渲染：通过之后实际显示的画布先绘制一次，
+        # 把字体缓存扫描等一次性开销放到启动阶段，汇总图弹出时只剩绘图本身
+        font_manager.findfont(FontProperties(family=plt.rcParams['font.sans-serif']))
+        self._summary_canvas.draw()
+
+    def _build_summary_window(self):
+        """创建（隐藏的）汇总窗口：上方为结果文本，下方嵌入汇总图"""
+        top = tk.Toplevel(self.root)
+        top.title("Session 汇总分析")
+        top.geometry("900x700")
+        top.withdraw()
+        # 关闭时只隐藏窗口：图只有一个，不能让多个窗口同时嵌入它
+        top.protocol("WM_DELETE_WINDOW", top.withdraw)
+
+        self._summary_label = tk.Label(top, font=("SimHei", 12), justify="left", bg="#e8f5e9", padx=10, pady=10)
+        self._summary_label.pack(fill="x", pady=5)
+
+        self._summary_canvas = FigureCanvasTkAgg(self._summary_fig, master=top)
+        self._summary_canvas.get_tk_widget().pack(fill="both", expand=True)
+        self._summary_top = top
+
     def on_canvas_resize(self, event):
         """画布大小改变时触发"""
         self.canvas_width = event.width
         self.canvas_height = event.height
+        self._update_safe_area()
+
+    def _update_safe_area(self):
+        """按当前画布尺寸预计算目标坐标的上界（确保画布有足够空间），生成目标时直接取用"""
+        margin = self.TARGET_MARGIN
+        self._safe_w = max(self.canvas_width - margin, margin + 1)
+        self._safe_h = max(self.canvas_height - margin, margin + 1)
 
     def start_test(self):
         """开始一个新的测试 Session"""
         self.canvas.delete("all")
+        self.target_circle = None
         self.session_data = []
+        self.metrics = np.zeros((self.max_trials, 4))
         self.current_trial = 0
+        self.reset_csv()
         
         # 绘制起始按钮 (蓝色)
         r = 30 
@@ -131,34 +196,61 @@ class MouseTrackerApp:
         """生成目标点，开始记录某一轮"""
         self.current_trial += 1
         self.is_recording = True
-        self.start_time = time.time()
-        self.trajectory_data = [] # 重置当轮轨迹
+        self.start_time = time.perf_counter_ns()
+        # 重置当轮轨迹（复用已分配的缓冲区，只归零写入位置）
+        self.nbuf = 0
+        self._last_t = self.start_time
+        self._run_dist = 0.0
+        self._prev_x, self._prev_y = self.last_click_pos
         
         # 记录起始点数据 (复用上一轮的点击位置 或 起始位置)
-        self.trajectory_data.append((self.last_click_pos[0], self.last_click_pos[1], self.start_time))
+        self.append_point(self.last_click_pos[0], self.last_click_pos[1], self.start_time)
         
-        # 随机生成目标位置
-        margin = 100 # 增加边距，防止太靠边
-        # 确保画布有足够空间
-        safe_w = max(self.canvas_width - margin, margin + 1)
-        safe_h = max(self.canvas_height - margin, margin + 1)
-        
-        target_x = random.randint(margin, safe_w)
-        target_y = random.randint(margin, safe_h)
+        # 随机生成目标位置（可用范围已在画布尺寸变化时算好）
+        randint = self._rng.randint
+        margin = self.TARGET_MARGIN
+        target_x = randint(margin, self._safe_w)
+        target_y = randint(margin, self._safe_h)
         self.target_pos = (target_x, target_y)
         
-        # 绘制目标 (红色)
+        # 绘制目标 (红色)：首轮创建并绑定点击，其后只移动并显示同一个图元
         r = self.TARGET_RADIUS
-        self.target_circle = self.canvas.create_oval(target_x-r, target_y-r, target_x+r, target_y+r, fill=self.colors["target"], outline="white", width=2, tags="target")
-        self.canvas.tag_bind("target", "<Button-1>", self.handle_target_click)
+        if self.target_circle is None:
+            self.target_circle = self.canvas.create_oval(target_x-r, target_y-r, target_x+r, target_y+r, fill=self.colors["target"], outline="white", width=2, tags="target")
+            self.canvas.tag_bind("target", "<Button-1>", self.handle_target_click)
+        else:
+            self.canvas.coords(self.target_circle, target_x-r, target_y-r, target_x+r, target_y+r)
+            self.canvas.itemconfig(self.target_circle, state="normal")
         
         self.info_label.config(text=f"进度: {self.current_trial}/{self.max_trials} - 请快速点击红色目标！", fg=self.colors["target"])
 
-    def record_movement(self, event):
-        """记录鼠标移动轨迹"""
+    def record_movement(self, event, _pc=time.perf_counter_ns):
+        """记录鼠标移动轨迹（带节流）；计时函数以默认参数绑定为局部名"""
         if self.is_recording:
-            current_time = time.time()
-            self.trajectory_data.append((event.x, event.y, current_time))
+            t = _pc()
+            if t - self._last_t < self._min_dt_ns:
+                return
+            self._last_t = t
+            x = event.x
+            y = event.y
+            self.append_point(x, y, t)
+
+    def append_point(self, x, y, t):
+        """向轨迹缓冲区写入一个点（三次标量写入，不分配元组），写满时容量翻倍；同时累加路径长度"""
+        dx = x - self._prev_x
+        dy = y - self._prev_y
+        self._run_dist += math.sqrt(dx * dx + dy * dy)
+        self._prev_x = x
+        self._prev_y = y
+
+        n = self.nbuf
+        if n == self.buf.shape[1]:
+            self.buf = np.concatenate((self.buf, np.empty_like(self.buf)), axis=1)
+            self._bx, self._by, self._bt = self.buf
+        self._bx[n] = x
+        self._by[n] = y
+        self._bt[n] = t
+        self.nbuf = n + 1
 
     def handle_target_click(self, event):
         """处理目标点击：记录数据，判断是否继续"""
@@ -166,15 +258,19 @@ class MouseTrackerApp:
             return
             
         self.is_recording = False
-        self.canvas.delete("target")
-        click_time = time.time()
+        self.canvas.itemconfig(self.target_circle, state="hidden")
+        click_time = time.perf_counter_ns()
         
         # 添加最后一点
-        self.trajectory_data.append((event.x, event.y, click_time))
+        self.append_point(event.x, event.y, click_time)
         
         # 分析本轮数据并存储
-        trial_metrics = self.analyze_single_trial(self.trajectory_data, self.target_pos)
+        xs, ys, ts = self.buf[:, :self.nbuf]
+        trial_metrics = self.analyze_single_trial(xs, ys, ts, self._run_dist, self.target_pos)
         self.session_data.append(trial_metrics)
+        trial_id = len(self.session_data)
+        self.metrics[trial_id - 1] = (trial_metrics["time"], trial_metrics["speed"], trial_metrics["curvature"], trial_metrics["throughput"])
+        self.append_csv_row(trial_id, trial_metrics)
         
         # 更新位置用于下一轮
         self.last_click_pos = (event.x, event.y)
@@ -186,35 +282,29 @@ class MouseTrackerApp:
             # 结束 Session
             self.show_session_summary()
 
-    def analyze_single_trial(self, trajectory, target_pos):
-        """分析单次点击的数据"""
-        if len(trajectory) < 2:
+    def analyze_single_trial(self, xs, ys, ts, total_distance, target_pos):
+        """分析单次点击的数据（路径长度已在采样时累加，其余指标只依赖首末点，O(1) 完成）
+
+        xs / ys 为像素坐标，ts 为 perf_counter_ns 整数时间戳。
+        """
+        # 只保留抽稀后的 float32 轨迹副本供绘图（等间距取至多 400 个点，首末点一定保留：理想路径取首末点）
+        # 整数纳秒戳换算为相对本轮起点的秒数
+        n = len(xs)
+        idx = np.linspace(0, n - 1, min(n, 400)).astype(np.intp)
+        trajectory = np.vstack((xs[idx], ys[idx], (ts[idx] - ts[:1]) * 1e-9)).astype(np.float32)
+        if n < 2:
             return {
                 "time": 0, "distance": 0, "speed": 0, "curvature": 1, 
                 "ideal_distance": 0, "target_x": target_pos[0], "target_y": target_pos[1],
                 "id": 0, "throughput": 0, # Fitts' Law
-                "trajectory": []
+                "trajectory": trajectory
             }
 
-        # 计算距离和速度
-        total_distance = 0
-        velocities = []
-        for i in range(1, len(trajectory)):
-            x1, y1, t1 = trajectory[i-1]
-            x2, y2, t2 = trajectory[i]
-            dist = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            time_diff = t2 - t1
-            total_distance += dist
-            if time_diff > 0:
-                velocities.append(dist / time_diff)
-
         # 理想直线
-        start_x, start_y, _ = trajectory[0]
-        end_x, end_y, _ = trajectory[-1]
-        ideal_distance = math.sqrt((end_x - start_x)**2 + (end_y - start_y)**2)
+        ideal_distance = math.hypot(xs[-1] - xs[0], ys[-1] - ys[0])
 
         # 指标
-        time_elapsed = trajectory[-1][2] - trajectory[0][2]
+        time_elapsed = float(ts[-1] - ts[0]) * 1e-9
         avg_speed = total_distance / time_elapsed if time_elapsed > 0 else 0
         curvature = total_distance / ideal_distance if ideal_distance > 0 else 1
         
@@ -237,7 +327,7 @@ class MouseTrackerApp:
             "throughput": throughput,
             "target_x": target_pos[0],
             "target_y": target_pos[1],
-            "trajectory": list(trajectory) # 保存轨迹副本
+            "trajectory": trajectory # 形状 (3, N)：x / y / t 三行
         }
 
     def show_session_summary(self):
@@ -247,10 +337,7 @@ class MouseTrackerApp:
         if total_trials == 0:
             return
 
-        avg_time = sum(d["time"] for d in self.session_data) / total_trials
-        avg_speed = sum(d["speed"] for d in self.session_data) / total_trials
-        avg_curvature = sum(d["curvature"] for d in self.session_data) / total_trials
-        avg_throughput = sum(d["throughput"] for d in self.session_data) / total_trials
+        avg_time, avg_speed, avg_curvature, avg_throughput = self.metrics[:total_trials].mean(axis=0)
         
         # 保存数据
         saved_path = self.save_to_csv()
@@ -270,79 +357,138 @@ class MouseTrackerApp:
         # 绘图
         self.plot_session_results(result_text)
 
-    def save_to_csv(self):
-        """将本次 Session 数据保存到 CSV"""
+    def csv_filepath(self):
+        """按当前时间生成 CSV 文件路径（data/session_<时间戳>.csv）"""
         data_dir = "data"
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
             
         timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"session_{timestamp_str}.csv"
-        filepath = os.path.join(data_dir, filename)
-        
+        return os.path.join(data_dir, filename)
+
+    def reset_csv(self):
+        """结束上一个 Session 的 CSV（已写入的试次保留在文件中），新文件待首个试次完成时再创建"""
+        self.close_csv()
+        self._csv_path = None
+        self._csv_rows = 0
+
+    def open_csv(self):
+        """新建本次 Session 的 CSV 文件并写入表头，之后每轮结束即追加一行"""
+        self.close_csv()
         headers = ["Trial_ID", "Time_Sec", "Distance_Px", "Ideal_Distance_Px", "Speed_PxSec", "Curvature", "Index_of_Difficulty_Bits", "Throughput_Bits_Sec", "Target_X", "Target_Y"]
         
         try:
-            with open(filepath, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-                
-                for i, trial in enumerate(self.session_data):
-                    writer.writerow([
-                        i + 1,
-                        f"{trial['time']:.4f}",
-                        f"{trial['distance']:.2f}",
-                        f"{trial['ideal_distance']:.2f}",
-                        f"{trial['speed']:.2f}",
-                        f"{trial['curvature']:.4f}",
-                        f"{trial['id']:.4f}",
-                        f"{trial['throughput']:.4f}",
-                        trial['target_x'],
-                        trial['target_y']
-                    ])
-            return filepath
+            filepath = self.csv_filepath()
+            self._csv_f = open(filepath, mode='w', newline='', encoding='utf-8')
+            self._csv_w = csv.writer(self._csv_f)
+            self._csv_w.writerow(headers)
+            self._csv_f.flush()
+            self._csv_path = filepath
         except Exception as e:
             print(f"Save failed: {e}")
-            return "保存失败"
+            self.close_csv()
+            self._csv_path = "保存失败"
 
+    def append_csv_row(self, trial_id, trial):
+        """把一轮结果立即写入 CSV 并落盘，中途退出也能保留已完成的试次"""
+        if self._csv_w is None:
+            if self._csv_path is not None: # 本 Session 已保存失败，不再重试
+                return
+            self.open_csv()
+            if self._csv_w is None:
+                return
+        try:
+            self._csv_w.writerow([
+                trial_id,
+                f"{trial['time']:.4f}",
+                f"{trial['distance']:.2f}",
+                f"{trial['ideal_distance']:.2f}",
+                f"{trial['speed']:.2f}",
+                f"{trial['curvature']:.4f}",
+                f"{trial['id']:.4f}",
+                f"{trial['throughput']:.4f}",
+                trial['target_x'],
+                trial['target_y']
+            ])
+            self._csv_rows += 1
+            self._csv_f.flush()
+        except Exception as e:
+            print(f"Save failed: {e}")
+            self.close_csv()
+            self._csv_path = "保存失败"
 
+    def close_csv(self):
+        """关闭当前 CSV 文件（若已打开）；没有写入任何试次的文件直接删除"""
+        if self._csv_f is not None:
+            self._csv_f.close()
+            if self._csv_rows == 0:
+                try:
+                    os.remove(self._csv_path)
+                except OSError:
+                    pass
+                self._csv_path = None
+        self._csv_f = None
+        self._csv_w = None
+
+    def save_to_csv(self):
+        """结束本次 Session 的 CSV 写入，返回文件路径（各行已在每轮结束时写入）
+
+        文件按完成时间重命名，与一次性保存时的命名保持一致。
+        """
+        self.close_csv()
+        filepath = self._csv_path
+        if filepath is None or filepath == "保存失败":
+            filepath = "保存失败"
+        elif self._csv_rows:
+            try:
+                final_path = self.csv_filepath()
+                os.replace(filepath, final_path)
+                filepath = final_path
+            except Exception as e:
+                print(f"Rename failed: {e}")
+        # 本 Session 的文件已完成，后续 reset 不再触碰它
+        self._csv_path = None
+        self._csv_rows = 0
+        return filepath
 
     def plot_session_results(self, result_text):
         """绘制 Session 所有轨迹图"""
-        top = tk.Toplevel(self.root)
-        top.title("Session 汇总分析")
-        top.geometry("900x700")
-
+        ax = self._summary_ax
         # 上方显示文本结果
-        lbl_result = tk.Label(top, text=result_text, font=("SimHei", 12), justify="left", bg="#e8f5e9", padx=10, pady=10)
-        lbl_result.pack(fill="x", pady=5)
+        self._summary_label.config(text=result_text)
+        self._summary_top.deiconify()
+        self._summary_top.lift()
 
-        fig, ax = plt.subplots(figsize=(8, 6), dpi=100)
+        ax.cla()
         h = self.canvas_height
 
-        # 绘制每一轮的轨迹
+        # 所有轨迹（及理想路径）各汇总为一个 LineCollection，一次绘制完成
+        segs, colors, ideal_segs = [], [], []
         for i, trial in enumerate(self.session_data):
-            traj = trial["trajectory"]
-            x_vals = [p[0] for p in traj]
-            y_vals = [h - p[1] for p in traj]
+            xs, ys, _ = trial["trajectory"]
+            if xs.size == 0:
+                continue
             
             # 使用较浅的颜色绘制旧轨迹，深色绘制最新轨迹
             alpha = 0.3 + 0.7 * (i / len(self.session_data))
-            ax.plot(x_vals, y_vals, '-', color='#2196F3', alpha=alpha, linewidth=1)
+            # 轨迹在分析时已抽稀到绘图分辨率（含终点），这里直接绘制
+            segs.append(np.column_stack([xs, h - ys]))
+            colors.append(to_rgba('#2196F3', alpha))
             
-            # 绘制理想路径 (虚线)
-            sx, sy, _ = traj[0]
-            ex, ey, _ = traj[-1]
-            ax.plot([sx, ex], [h-sy, h-ey], '--', color='#F44336', alpha=0.3, linewidth=1)
+            # 理想路径 (虚线)
+            ideal_segs.append([(xs[0], h - ys[0]), (xs[-1], h - ys[-1])])
+
+        ax.add_collection(LineCollection(segs, colors=colors, linewidths=1))
+        ax.add_collection(LineCollection(ideal_segs, colors=to_rgba('#F44336', 0.3), linestyles='--', linewidths=1))
+        ax.autoscale_view()
 
         ax.set_title(f"全 Session 轨迹叠加 ({len(self.session_data)} Trials)", fontsize=14)
         ax.set_xlabel("X (px)")
         ax.set_ylabel("Y (px)")
         ax.grid(True, linestyle=':', alpha=0.6)
         
-        canvas = FigureCanvasTkAgg(fig, master=top)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        self._summary_canvas.draw_idle() # 放入 Tk 空闲队列绘制，不阻塞当前事件处理
 
 if __name__ == "__main__":
     root = tk.Tk()